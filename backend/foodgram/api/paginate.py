@@ -1,5 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class FoodgramPagination(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class RecipeCursorPagination(CursorPagination):
+    # keyset-пагинация: глубокие страницы не платят за OFFSET;
+    # -id разводит рецепты с одинаковым pub_date
+    ordering = ('-pub_date', '-id')
+    page_size_query_param = 'limit'
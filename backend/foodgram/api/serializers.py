@@ -1,18 +1,32 @@
-import base64
+import binascii
+import tempfile
 
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
-from django.shortcuts import get_object_or_404
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
 from recipes.models import (Basket, Favorite, Ingredient, IngredientInRecipe,
                             Recipe, Tag)
 from rest_framework import serializers, status
 from rest_framework.exceptions import ValidationError
 from rest_framework.fields import SerializerMethodField
+from rest_framework.relations import MANY_RELATION_KWARGS
 from rest_framework.serializers import ModelSerializer
 from users.models import Subscription, User
 
 User = get_user_model()
 
+
+def get_subscribed_ids(context, user):
+    """Id авторов, на которых подписан user (один запрос на request)."""
+    if "subscribed_ids" not in context:
+        context["subscribed_ids"] = set(
+            Subscription.objects.filter(user=user).values_list(
+                "subscribing_id", flat=True
+            )
+        )
+    return context["subscribed_ids"]
+
+
 class IngredientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ingredient
@@ -27,10 +41,32 @@ class TagSerializer(ModelSerializer):
 
 
 class ImageFieldSerializer(serializers.ImageField):
+    # кратно 4, чтобы каждый кусок был валидным base64
+    base64_chunk_size = 256 * 1024
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith("data:image"):
-            image_data = data.split(";base64,")[-1]
-            data = ContentFile(base64.b64decode(image_data), name="photo.jpg")
+            # пробелы и переводы строк ломают разбиение на куски,
+            # кратные четырём
+            image_data = "".join(data.partition(";base64,")[2].split())
+            # маленькие картинки остаются в памяти,
+            # большие сбрасываются на диск
+            buffer = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+            try:
+                for start in range(
+                    0, len(image_data), self.base64_chunk_size
+                ):
+                    buffer.write(
+                        binascii.a2b_base64(
+                            image_data[start:start + self.base64_chunk_size]
+                        )
+                    )
+            except binascii.Error:
+                raise ValidationError(
+                    "Некорректная base64-строка изображения."
+                )
+            buffer.seek(0)
+            data = File(buffer, name="photo.jpg")
 
         return super().to_internal_value(data)
 
@@ -48,18 +84,22 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_is_subscribed(self, object):
         user = self.context.get("request").user
-        return (
-            user.is_authenticated
-            and Subscription.objects.filter(
-                user=user,
-                subscripting=object.id).exists()
-        )
+        if not user.is_authenticated:
+            return False
+        return object.id in get_subscribed_ids(self.context, user)
 
 
 
 class SubscribeSerializer(ModelSerializer):
 
-    recipes_count = SerializerMethodField()
+    email = serializers.EmailField(
+        source="subscribing.email", read_only=True
+    )
+    username = serializers.CharField(
+        source="subscribing.username", read_only=True
+    )
+    is_subscribed = SerializerMethodField()
+    recipes_count = serializers.IntegerField(read_only=True)
     recipes = SerializerMethodField()
 
     class Meta:
@@ -71,7 +111,6 @@ class SubscribeSerializer(ModelSerializer):
             "recipes_count",
             "recipes",
         )
-        read_only_fields = ("email", "username")
 
     def validate(self, data):
         subscribing = self.instance
@@ -88,30 +127,93 @@ class SubscribeSerializer(ModelSerializer):
             )
         return data
 
-    def get_is_subscribed(*args):
-        return True
-
-    def get_recipes_count(self, object):
-        return object.recipes.count()
+    def get_is_subscribed(self, object):
+        user = self.context.get("request").user
+        if not user.is_authenticated:
+            return False
+        return object.subscribing_id in get_subscribed_ids(
+            self.context, user
+        )
 
     def get_recipes(self, obj):
-        recipes = obj.recipes.all()(author=obj.user)
+        recipes = getattr(obj.subscribing, "limited_recipes", None)
+        if recipes is None:
+            recipes = obj.subscribing.recipe_author.all()
+        request = self.context.get("request")
+        limit = request.query_params.get("recipes_limit") if request else None
+        # нечисловой recipes_limit просто игнорируем
+        if limit and limit.isdigit():
+            recipes = recipes[: int(limit)]
         serializer = RecipeCartSerializer(recipes, many=True,
-                                           read_only=True)
+                                          read_only=True)
         return serializer.data
 
 
 class RecipeIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        source="ingredient.id", read_only=True
+    # ingredient_id лежит прямо на IngredientInRecipe,
+    # name/measurement_unit берутся из select_related('ingredient')
+    id = serializers.IntegerField(source="ingredient_id", read_only=True)
+    name = serializers.CharField(source="ingredient.name", read_only=True)
+    measurement_unit = serializers.CharField(
+        source="ingredient.measurement_unit", read_only=True
     )
 
+    class Meta:
+        model = IngredientInRecipe
+        fields = ("id", "name", "measurement_unit", "amount")
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """ManyRelatedField, резолвящий все pk одним запросом.
+
+    Стандартный ManyRelatedField делает queryset.get() на каждый
+    элемент списка — по запросу на тег.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        queryset = self.child_relation.get_queryset()
+        pk_field = queryset.model._meta.pk
+        pks = []
+        for item in data:
+            try:
+                pks.append(pk_field.to_python(item))
+            except (TypeError, ValueError, DjangoValidationError):
+                self.child_relation.fail(
+                    "incorrect_type", data_type=type(item).__name__
+                )
+        found = queryset.in_bulk(pks)
+        for pk in pks:
+            if pk not in found:
+                self.child_relation.fail("does_not_exist", pk_value=pk)
+        return [found[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+
+class AddIngredientSerializer(serializers.ModelSerializer):
+    # сами ингредиенты резолвятся пачкой в validate_ingredients,
+    # поэтому здесь просто целое число
+    id = serializers.IntegerField()
+
     class Meta:
         model = IngredientInRecipe
         fields = ("id", "amount")
 
     def validate_amount(self, value):
-        if int(value) <= 0:
+        # поле уже привело значение к int
+        if value <= 0:
             raise ValidationError(
                 'Количество ингредиента не должно быть 0!'
             )
@@ -121,73 +223,133 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
 class RecipeSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     image = ImageFieldSerializer()
-    ingredients = RecipeIngredientSerializer(many=True)
+    ingredients = AddIngredientSerializer(many=True)
+    tags = BulkPrimaryKeyRelatedField(
+        queryset=Tag.objects.all(), many=True
+    )
 
     class Meta:
         model = Recipe
         fields = (
             "author",
             "ingredients",
+            "tags",
             "name",
             "image",
             "text",
             "cooking_time",
         )
-        read_only_fields = ("tags",)
 
     def validate_tags(self, tags):
         if not tags:
             raise ValidationError("Укажите хотя бы один тег.")
-        if len(tags) != len(set(tags)):
+        if len(tags) != len({tag.pk for tag in tags}):
             raise ValidationError("Теги не должны повторяться.")
-
+        return tags
 
     def validate_ingredients(self, ingredients):
-        ingredients_list = []
         if not ingredients:
             raise ValidationError("Укажите хотя бы один ингредиент.")
+        seen_ids = set()
         for ingredient in ingredients:
-            get_object_or_404(Ingredient, pk=ingredient["id"])
-            try:
-                int(ingredient["amount"])
-            except ValueError:
-                raise ValidationError(
-                    "Количество ингредиента должно быть записано только в "
-                    "виде числа."
-                )
-            if int(ingredient["amount"]) < 0:
-                raise ValidationError("Минимальное количество игредиента - 0.")
-            if ingredient in ingredients_list:
+            ingredient_id = ingredient["id"]
+            if ingredient_id in seen_ids:
                 raise ValidationError("Ингредиенты не должны повторяться.")
-            ingredients_list.append(ingredient)
-        return ingredients_list
+            seen_ids.add(ingredient_id)
+        # все ингредиенты одним запросом вместо get() на каждый id
+        found = Ingredient.objects.in_bulk(seen_ids)
+        missing = seen_ids - set(found)
+        if missing:
+            raise ValidationError(
+                f"Несуществующие ингредиенты: {sorted(missing)}."
+            )
+        for ingredient in ingredients:
+            ingredient["ingredient"] = found[ingredient["id"]]
+        return ingredients
 
     def validate_cooking_time(self, cooking_time):
-        if int(cooking_time) < 1:
+        if cooking_time < 1:
             raise ValidationError("Минимальное время приготовления - 1 мин.")
+        return cooking_time
+
+    def create_ingredients(self, recipe, ingredients):
+        IngredientInRecipe.objects.bulk_create(
+            [
+                IngredientInRecipe(
+                    recipe=recipe,
+                    ingredient=ingredient["ingredient"],
+                    amount=ingredient["amount"],
+                )
+                for ingredient in ingredients
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
 
-    def validate(self, data):
-        tags = self.initial_data.get("tags")
-        self.validate_tags(tags)
-        data["tags"] = tags
-
-        ingredients = self.initial_data.get("ingredients")
-        ingredients_list = self.validate_ingredients(ingredients)
-        data["ingredients"] = ingredients_list
-
-        cooking_time = self.initial_data.get("cooking_time")
-        self.validate_cooking_time(cooking_time)
-
-        return data
+    def create(self, validated_data):
+        tags = validated_data.pop("tags")
+        ingredients = validated_data.pop("ingredients")
+        recipe = Recipe.objects.create(**validated_data)
+        Recipe.tags.through.objects.bulk_create(
+            [
+                Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.pk)
+                for tag in tags
+            ],
+            ignore_conflicts=True,
+        )
+        self.create_ingredients(recipe, ingredients)
+        return recipe
+
+    def update_ingredients(self, recipe, ingredients):
+        existing = {
+            row.ingredient_id: row
+            for row in IngredientInRecipe.objects.filter(recipe=recipe)
+        }
+        wanted = {
+            ingredient["ingredient"].pk: ingredient["amount"]
+            for ingredient in ingredients
+        }
+        changed = []
+        for ingredient_id, row in existing.items():
+            if ingredient_id in wanted and row.amount != wanted[ingredient_id]:
+                row.amount = wanted[ingredient_id]
+                changed.append(row)
+        if changed:
+            IngredientInRecipe.objects.bulk_update(changed, ["amount"])
+        added = [
+            ingredient
+            for ingredient in ingredients
+            if ingredient["ingredient"].pk not in existing
+        ]
+        if added:
+            self.create_ingredients(recipe, added)
+        removed = set(existing) - set(wanted)
+        if removed:
+            IngredientInRecipe.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            ).delete()
+
+    def update(self, instance, validated_data):
+        tags = validated_data.pop("tags", None)
+        ingredients = validated_data.pop("ingredients", None)
+        instance = super().update(instance, validated_data)
+        if tags is not None:
+            instance.tags.set(tags)
+        if ingredients is not None:
+            self.update_ingredients(instance, ingredients)
+        return instance
+
+    def to_representation(self, instance):
+        return GetRecipeSerializer(instance, context=self.context).data
 
 
 class GetRecipeSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     author = UserSerializer(read_only=True)
     ingredients = SerializerMethodField()
-    image = ImageFieldSerializer()
-    is_favorited = SerializerMethodField(read_only=True)
-    is_in_basket = SerializerMethodField(read_only=True)
+    image = SerializerMethodField()
+    is_favorited = serializers.BooleanField(read_only=True, default=False)
+    is_in_basket = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = Recipe
@@ -203,19 +365,20 @@ class GetRecipeSerializer(serializers.ModelSerializer):
             "is_in_basket",
         )
 
-    def get_is_favorited(self, object):
-        user = self.context.get("request").user
-        return (
-            not user.is_anonymous
-            and user.favorite.filter(recipe=object).exists()
-        )
+    def get_image(self, object):
+        if object.image:
+            return object.image.url
+        return None
 
-    def get_is_in_basket(self, object):
-        user = self.context.get("request").user
-        return (
-            not user.is_anonymous
-            and user.shoppingcart.filter(recipe=object).exists()
-        )
+    def get_ingredients(self, object):
+        prefetched = getattr(object, "_prefetched_objects_cache", {})
+        if "ingredient_list" in prefetched:
+            rows = object.ingredient_list.all()
+        else:
+            # эхо-ответ после create/update идёт без prefetch —
+            # без select_related каждый ингредиент стоил бы запроса
+            rows = object.ingredient_list.select_related("ingredient")
+        return RecipeIngredientSerializer(rows, many=True).data
 
 
 class FavoriteSerializer(serializers.ModelSerializer):
@@ -238,8 +401,13 @@ class BasketSerializer(FavoriteSerializer):
 
 
 class RecipeCartSerializer(ModelSerializer):
-    image = ImageFieldSerializer()
+    image = SerializerMethodField()
 
     class Meta:
         model = Recipe
         fields = ("name", "image", "cooking_time")
+
+    def get_image(self, object):
+        if object.image:
+            return object.image.url
+        return None
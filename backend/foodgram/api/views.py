@@ -1,12 +1,16 @@
 from datetime import datetime
 
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.db.models import (BooleanField, Count, Exists, OuterRef, Prefetch,
+                              Sum, Value)
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django_auto_prefetching import AutoPrefetchViewSetMixin
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from recipes.models import (Basket, Favorite, Ingredient, IngredientInRecipe,
                             Recipe, Tag)
+from recipes.signals import TAGS_CACHE_KEY
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import SAFE_METHODS, AllowAny, IsAuthenticated
@@ -16,13 +20,14 @@ from rest_framework.status import HTTP_400_BAD_REQUEST
 from users.models import Subscription, User
 
 from .filters import IngredientFilter, RecipeFilter
+from .paginate import RecipeCursorPagination
 from .permissions import IsAuthorOrReadOnly
 from .serializers import (GetRecipeSerializer, IngredientSerializer,
                           RecipeCartSerializer, RecipeSerializer,
                           SubscribeSerializer, TagSerializer, UserSerializer)
 
 
-class UserViewSet(UserViewSet):
+class UserViewSet(AutoPrefetchViewSetMixin, UserViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
@@ -34,7 +39,24 @@ class UserViewSet(UserViewSet):
 
     @action(detail=False, permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
-        queryset = Subscription.objects.filter(author=request.user)
+        queryset = (
+            Subscription.objects.filter(user=request.user)
+            .select_related("subscribing")
+            .prefetch_related(
+                Prefetch(
+                    "subscribing__recipe_author",
+                    queryset=Recipe.objects.only(
+                        "id", "name", "image", "cooking_time", "author_id"
+                    ),
+                    to_attr="limited_recipes",
+                )
+            )
+            .annotate(
+                recipes_count=Count(
+                    "subscribing__recipe_author", distinct=True
+                )
+            )
+        )
         page = self.paginate_queryset(queryset)
         serializer = SubscribeSerializer(
             page, many=True, context={"request": request}
@@ -55,29 +77,34 @@ class UserViewSet(UserViewSet):
             return self.add_subscribe(Subscription, request, id)
 
     def add_subscribe(self, model, request, id):
-        author = request.user
-        user = get_object_or_404(User, id=id)
-        if user == author:
+        user = request.user
+        subscribing = get_object_or_404(User, id=id)
+        if user == subscribing:
             raise ValidationError(
                 {"errors": "Вы не можете подписаться на самого себя."}
             )
-        elif model.objects.filter(user=user, author=author).exists():
+        elif model.objects.filter(
+            user=user, subscribing=subscribing
+        ).exists():
             raise ValidationError(
                 {"errors": "Вы уже подписаны на этого пользователя."}
             )
-        follow = model.objects.create(user=user, author=author)
+        follow = model.objects.create(user=user, subscribing=subscribing)
+        follow.recipes_count = subscribing.recipe_author.count()
         serializer = SubscribeSerializer(follow, context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def del_subscribe(self, model, request, id):
-        author = request.user
-        user = get_object_or_404(User, id=id)
-        if user == author:
+        user = request.user
+        subscribing = get_object_or_404(User, id=id)
+        if user == subscribing:
             raise ValidationError(
                 {"errors": "Вы не можете отписаться от самого себя."}
             )
-        elif model.objects.filter(user=user, author=author).exists():
-            model.objects.filter(user=user, author=author).delete()
+        elif model.objects.filter(
+            user=user, subscribing=subscribing
+        ).exists():
+            model.objects.filter(user=user, subscribing=subscribing).delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
         raise ValidationError(
             {"errors": "Вы не подписаны на этого пользователя."}
@@ -99,18 +126,60 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (AllowAny,)
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        # теги почти не меняются, кэш сбрасывается сигналами
+        data = cache.get_or_set(
+            TAGS_CACHE_KEY,
+            lambda: TagSerializer(self.get_queryset(), many=True).data,
+            60 * 60,
+        )
+        return Response(data)
+
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
     permission_classes = (IsAuthorOrReadOnly,)
+    pagination_class = RecipeCursorPagination
+    # AddIngredientSerializer.id (source='ingredient') не является
+    # связью Recipe — миксин выводит из него неверный prefetch
+    auto_prefetch_excluded_fields = {"ingredients", "ingredients__ingredient"}
+
+    def get_prefetchable_queryset(self):
+        # tags и author выводятся миксином из сериализатора;
+        # ingredients — SerializerMethodField, его миксин не видит
+        queryset = Recipe.objects.prefetch_related(
+            Prefetch(
+                "ingredient_list",
+                queryset=IngredientInRecipe.objects.select_related(
+                    "ingredient"
+                ),
+            ),
+        )
+        user = self.request.user
+        if user.is_authenticated:
+            return queryset.annotate(
+                is_favorited=Exists(
+                    Favorite.objects.filter(user=user, recipe=OuterRef("pk"))
+                ),
+                is_in_basket=Exists(
+                    Basket.objects.filter(user=user, recipe=OuterRef("pk"))
+                ),
+            )
+        return queryset.annotate(
+            is_favorited=Value(False, output_field=BooleanField()),
+            is_in_basket=Value(False, output_field=BooleanField()),
+        )
 
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
             return GetRecipeSerializer
         return RecipeSerializer
 
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
+
     @action(
         detail=True,
         methods=["post", "delete"],
@@ -139,7 +208,10 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 {"errors": "Рецепт уже добавлен!"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        recipe = get_object_or_404(Recipe, id=pk)
+        recipe = get_object_or_404(
+            Recipe.objects.only("id", "name", "image", "cooking_time"),
+            id=pk,
+        )
         model.objects.create(user=user, recipe=recipe)
         serializer = RecipeCartSerializer(recipe)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -161,30 +233,31 @@ class RecipeViewSet(viewsets.ModelViewSet):
             return Response(status=HTTP_400_BAD_REQUEST)
 
         ingredients = (
-            IngredientInRecipe.objects.filter(
-                recipe__shopping_cart__user=request.user
-            )
+            IngredientInRecipe.objects.filter(recipe__basket__user=user)
             .values("ingredient__name", "ingredient__measurement_unit")
-            .annotate(full_amount=Sum("amount"))
+            .annotate(total=Sum("amount"))
+            .order_by("ingredient__name")
         )
 
         today = datetime.today()
-        shopping_list = (
-            f"Список покупок для: {user.get_full_name()}\n\n"
-            f"Дата: {today:%Y-%m-%d}\n\n"
-        )
-        shopping_list += "\n".join(
-            [
-                f'- {ingredient["ingredient__name"]} '
-                f'({ingredient["ingredient__measurement_unit"]})'
-                f' - {ingredient["amount"]}'
-                for ingredient in ingredients
-            ]
-        )
-        shopping_list += f"\n\nFoodgram ({today:%Y})"
+
+        def shopping_list():
+            yield (
+                f"Список покупок для: {user.get_full_name()}\n\n"
+                f"Дата: {today:%Y-%m-%d}\n\n"
+            )
+            for ingredient in ingredients.iterator():
+                yield (
+                    f'- {ingredient["ingredient__name"]} '
+                    f'({ingredient["ingredient__measurement_unit"]})'
+                    f' - {ingredient["total"]}\n'
+                )
+            yield f"\nFoodgram ({today:%Y})"
 
         filename = f"{user.username}_shopping_list.txt"
-        response = HttpResponse(shopping_list, content_type="text/plain")
+        response = StreamingHttpResponse(
+            shopping_list(), content_type="text/plain"
+        )
         response["Content-Disposition"] = f"attachment; filename={filename}"
 
         return response
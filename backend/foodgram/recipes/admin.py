@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 
 from .models import (Basket, Favorite, Ingredient, IngredientInRecipe, Recipe,
                      Tag)
@@ -24,13 +25,23 @@ class RecipeAdmin(admin.ModelAdmin):
     search_fields = ("name", "author")
     readonly_fields = ("favorite",)
 
+    def get_queryset(self, request):
+        # без prefetch/annotate список рецептов делает
+        # по два запроса на строку
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related("tags")
+            .annotate(favorite_count=Count("favorite"))
+        )
+
     def tags(self, obj):
         return ", ".join([tag.name for tag in obj.tags.all()])
 
     tags.short_description = "Теги"
 
     def favorite(self, obj):
-        return obj.favorite.count()
+        return obj.favorite_count
 
     favorite.short_description = "B избранном"
 
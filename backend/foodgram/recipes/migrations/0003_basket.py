@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='Cart',
+            new_name='Basket',
+        ),
+        migrations.AlterModelOptions(
+            name='basket',
+            options={'verbose_name': 'Корзина'},
+        ),
+        migrations.AlterModelOptions(
+            name='favorite',
+            options={'verbose_name': 'Избранное'},
+        ),
+        migrations.RemoveConstraint(
+            model_name='basket',
+            name='unique cart',
+        ),
+        migrations.AlterField(
+            model_name='basket',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_cart', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AlterField(
+            model_name='basket',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='basket', to='recipes.recipe', verbose_name='Рецепт в корзине'),
+        ),
+        migrations.AlterField(
+            model_name='favorite',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='favorite_user', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AlterField(
+            model_name='favorite',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='favorite', to='recipes.recipe', verbose_name='Избранный рецепт'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='basket',
+            unique_together={('user', 'recipe')},
+        ),
+    ]
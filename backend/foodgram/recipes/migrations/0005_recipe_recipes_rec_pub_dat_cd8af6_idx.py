@@ -0,0 +1,19 @@
+# Generated by Django 5.2.17 on 2026-08-27 05:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_remove_ingredientinrecipe_unique_ingredient_for_recipe_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-pub_date'], name='recipes_rec_pub_dat_cd8af6_idx'),
+        ),
+    ]
@@ -64,6 +64,10 @@ class Recipe(models.Model):
     text = models.TextField(
         verbose_name="Описание рецепта"
     )
+    pub_date = models.DateTimeField(
+        verbose_name="Дата публикации",
+        auto_now_add=True,
+    )
     ingredients = models.ManyToManyField(
         Ingredient,
         verbose_name="Ингредиенты",
@@ -91,9 +95,13 @@ class Recipe(models.Model):
     )
 
     class Meta:
-        ordering = ["-id"]
+        ordering = ["-pub_date"]
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
+        indexes = [
+            models.Index(fields=["author", "-pub_date"]),
+            models.Index(fields=["-pub_date"]),
+        ]
 
     def __str__(self):
         return f"{self.name[:50]}"
@@ -132,6 +140,18 @@ class IngredientInRecipe(models.Model):
 
 
 class Basket(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Пользователь",
+        related_name="shopping_cart",
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name="Рецепт в корзине",
+        related_name="basket",
+    )
 
     class Meta:
         verbose_name = "Корзина"
@@ -139,6 +159,18 @@ class Basket(models.Model):
 
 
 class Favorite(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Пользователь",
+        related_name="favorite_user",
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name="Избранный рецепт",
+        related_name="favorite",
+    )
 
     class Meta:
         verbose_name = "Избранное"
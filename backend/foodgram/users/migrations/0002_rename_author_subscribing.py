@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='subscription',
+            name='unique_subscribing',
+        ),
+        migrations.RenameField(
+            model_name='subscription',
+            old_name='author',
+            new_name='subscribing',
+        ),
+        migrations.AlterField(
+            model_name='subscription',
+            name='subscribing',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subscribing', to=settings.AUTH_USER_MODEL, verbose_name='Подписавшийся'),
+        ),
+        migrations.AddConstraint(
+            model_name='subscription',
+            constraint=models.UniqueConstraint(fields=('user', 'subscribing'), name='unique_subscribing'),
+        ),
+    ]
@@ -50,9 +50,12 @@ class Subscription(models.Model):
 
     class Meta:
         verbose_name = "Подписка"
+        indexes = [
+            models.Index(fields=["subscribing", "user"]),
+        ]
         constraints = [
             UniqueConstraint(
-                fields=["author", "user"],
+                fields=["user", "subscribing"],
                 name="unique_subscribing")
         ]
 